@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
 import os
-import glob
-import io
 import html
-from ase.io import read, write
+import mmap
+import re
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+import numpy as np
+from ase import Atoms
+from ase.data import chemical_symbols
+from ase.io import read
 #for path verification
 
 HTML_TEMPLATE = r"""<!DOCTYPE html>
@@ -26,6 +31,23 @@ HTML_TEMPLATE = r"""<!DOCTYPE html>
 </style>
 <!-- JSmol from CDN -->
 <script src="https://chemapps.stolaf.edu/jmol/jsmol/JSmol.min.js"></script>
+<script>
+  // 所有卡片共用的 JSmol 参数，卡片里只覆盖 script
+  var JMOL_BASE = {
+    width: "100%",
+    height: "100%",
+    debug: false,
+    color: "0xFFFFFF",
+    use: "HTML5",
+    j2sPath: "https://chemapps.stolaf.edu/jmol/jsmol/j2s",
+    disableJ2SLoadMonitor: true,
+    disableInitialConsole: true,
+    allowJavaScript: true,
+    serverURL: "https://chemapps.stolaf.edu/jmol/jsmol/php/jsmol.php",
+    addSelectionOptions: false,
+    console: "none"
+  };
+</script>
 </head>
 <body>
 <h1>Gaussian16 visualization</h1>
@@ -33,91 +55,189 @@ HTML_TEMPLATE = r"""<!DOCTYPE html>
 """
 
 
+_NL2PIPE = str.maketrans({"\n": "|"})
+# 嵌入 JS 字符串前的转义表：一次 translate 同时处理两种引号
+_JS_ESCAPE = str.maketrans({'"': '&quot;', "'": "\\'"})
+
+
+CARD_TEMPLATE = Template(r"""
+    <div class="card">
+      <div class="meta">
+        <div class="name">$safe_title</div>
+        <div class="summary">Atoms: $natoms | Formula: $formula</div>
+      </div>
+      <div id="app$idx" class="viewer"></div>
+      <script>
+        (function(){
+          if(!window.Applets) window.Applets = {};
+          var Info = Object.assign({}, JMOL_BASE, { script: "$escaped_jscript" });
+          window.Applets["app$idx"] = Jmol.getApplet("app$idx", Info);
+          document.getElementById("app$idx").innerHTML = Jmol.getAppletHtml(window.Applets["app$idx"]);
+          Jmol.script(window.Applets["app$idx"], "background white; set antialiasDisplay on;");
+          Jmol.script(window.Applets["app$idx"], "select *; spacefill 23%; wireframe 0.15;");
+          Jmol.script(window.Applets["app$idx"], "zoom 100; center all;");
+        })();
+      </script>
+    </div>
+    """)
+
+
 def atoms_to_xyz(atoms, comment=""):
     """Return XYZ string (with natoms & comment line)."""
-    buf = io.StringIO()
-    write(buf, atoms, format="xyz", comment=comment)
-    return buf.getvalue()
+    # 直接格式化，不经过 ase.io.write 的格式分发：
+    # 符号与坐标拼成 (N, 4) 表，一次 % 运算生成全部原子行
+    natoms = len(atoms)
+    lines = [str(natoms), comment]
+    if natoms:
+        table = np.empty((natoms, 4), dtype=object)
+        table[:, 0] = atoms.get_chemical_symbols()
+        table[:, 1:] = atoms.get_positions()
+        lines.append("\n".join(["%s %.6f %.6f %.6f"] * natoms) % tuple(table.ravel()))
+    return "\n".join(lines)
 
 
 def xyz_to_jsmol_data_script(xyz_text):
     """
     将多行 XYZ 转成 JSmol 可内联的 'load data' 脚本。
     """
-    xyz_oneline = xyz_text.replace("\n", "|")
+    xyz_oneline = xyz_text.translate(_NL2PIPE)
     return "data 'model X'|" + xyz_oneline + "|end 'model X';show data;"
 
 
 def make_card(idx, title, natoms, formula, jsmol_script):
     # 每个卡片一个 <div id="appN"> 容器 + 初始化脚本
     safe_title = html.escape(title)
-    escaped_jscript = jsmol_script.replace('"', '&quot;').replace("'", "\\'")
+    escaped_jscript = jsmol_script.translate(_JS_ESCAPE)
     
-    return f"""
-    <div class="card">
-      <div class="meta">
-        <div class="name">{safe_title}</div>
-        <div class="summary">Atoms: {natoms} | Formula: {formula}</div>
-      </div>
-      <div id="app{idx}" class="viewer"></div>
-      <script>
-        (function(){{
-          if(!window.Applets) window.Applets = {{}};
-          var Info = {{
-            width: "100%",
-            height: "100%",
-            debug: false,
-            color: "0xFFFFFF",
-            use: "HTML5",
-            j2sPath: "https://chemapps.stolaf.edu/jmol/jsmol/j2s",
-            script: "{escaped_jscript}",
-            disableJ2SLoadMonitor: true,
-            disableInitialConsole: true,
-            allowJavaScript: true,
-            serverURL: "https://chemapps.stolaf.edu/jmol/jsmol/php/jsmol.php",
-            addSelectionOptions: false,
-            console: "none"
-          }};
-          window.Applets["app{idx}"] = Jmol.getApplet("app{idx}", Info);
-          document.getElementById("app{idx}").innerHTML = Jmol.getAppletHtml(window.Applets["app{idx}"]);
-          Jmol.script(window.Applets["app{idx}"], "background white; set antialiasDisplay on;");
-          Jmol.script(window.Applets["app{idx}"], "select *; spacefill 23%; wireframe 0.15;");
-          Jmol.script(window.Applets["app{idx}"], "zoom 100; center all;");
-        }})();
-      </script>
-    </div>
+    return CARD_TEMPLATE.substitute(
+        idx=idx, safe_title=safe_title, natoms=natoms, formula=formula,
+        escaped_jscript=escaped_jscript)
+
+
+_FORMULA_CACHE = {}
+
+
+def _hill_formula(numbers):
     """
+    与 atoms.get_chemical_formula() 相同的 Hill 式，但用 bincount 计数；
+    同一化学计量只格式化一次。
+    """
+    counts = np.bincount(numbers)
+    key = counts.tobytes()
+    formula = _FORMULA_CACHE.get(key)
+    if formula is None:
+        symcount = {chemical_symbols[z]: int(counts[z]) for z in np.nonzero(counts)[0]}
+        # ASE 的 hill 顺序：C、H 总在最前（无 C 时 H 打头），其余按字母序
+        head = [s for s in ("C", "H") if s in symcount]
+        order = head + sorted(s for s in symcount if s not in head)
+        formula = "".join(s if symcount[s] == 1 else f"{s}{symcount[s]}" for s in order)
+        _FORMULA_CACHE[key] = formula
+    return formula
+
+
+def _read_last_orientation(path):
+    """
+    从文件末尾倒序定位最后一个 orientation 块，只解析这一小段得到最终结构，
+    不必像 ASE 那样从头走完整个日志。找不到该块时返回 None。
+    """
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # 与 ASE 的 gaussian-out 读取保持一致：优先取最后一个 Input orientation，
+        # 没有时（如 Z-matrix 输入）才用 Standard orientation
+        start = mm.rfind(b"Input orientation:")
+        if start < 0:
+            start = mm.rfind(b"Standard orientation:")
+        if start < 0:
+            return None
+        mm.seek(start)
+        for _ in range(5):  # 标题行、分隔线、两行表头、分隔线
+            mm.readline()
+        body_start = mm.tell()
+        body_end = mm.find(b"-----", body_start)
+        if body_end < 0:
+            return None
+        body = mm[body_start:body_end]
+    # 每行：Center Number, Atomic Number, [Atomic Type,] X, Y, Z（旧版本没有 Atomic Type 列）
+    table = np.loadtxt(body.rstrip().decode("ascii", errors="ignore").splitlines(), ndmin=2)
+    numbers = table[:, 1].astype(int)
+    if (numbers < 0).any():
+        # Tv 平移矢量（Z = -2）等特殊行：交给 ASE 处理晶胞/pbc
+        return None
+    return Atoms(numbers=numbers, positions=table[:, -3:])
+
+
+def _load_structure(f):
+    """
+    子进程中执行：读取日志最后一帧并转成 XYZ。
+    返回 ((xyz, natoms, formula), None)；失败时返回 (None, 异常信息)。
+    """
+    try:
+        atoms = _read_last_orientation(f)
+        if atoms is None:
+            atoms = read(f, format="gaussian-out", index=-1)  # 取最后一帧（最终结构）
+        xyz = atoms_to_xyz(atoms, comment=os.path.basename(f))
+        formula = _hill_formula(atoms.numbers)
+    except Exception as e:
+        return None, str(e)
+    return (xyz, len(atoms), formula), None
+
+
+_NAT_RE = re.compile(r"(\d+)")
+
+
+def _natural_key(path):
+    """自然排序键：file2.log 排在 file10.log 之前。"""
+    return [int(c) if c.isdigit() else c.lower() for c in _NAT_RE.split(os.path.basename(path))]
+
+
+def _find_logs(directory="."):
+    """
+    列出目录下的 *.log 并自然排序。
+    用 os.scandir 只做后缀判断，省去 glob 的模式匹配；与 glob 一样跳过隐藏文件，
+    normcase 保证 Windows 下 .LOG 也能匹配。
+    """
+    with os.scandir(directory) as it:
+        logs = [e.name for e in it
+                if not e.name.startswith(".") and os.path.normcase(e.name).endswith(".log") and e.is_file()]
+    logs.sort(key=_natural_key)
+    return logs
 
 
 def main():
-    logs = sorted(glob.glob("*.log"))
+    logs = _find_logs()
     if not logs:
         raise SystemExit("No .log files found in current folder.")
 
-    cards_html = []
+    out = "gallery_jsmol.html"
+    tmp_out = out + ".part"
     n_ok = 0
-    for i, f in enumerate(logs):
-        try:
-            atoms = read(f, format="gaussian-out", index=-1)  # 取最后一帧（最终结构）
-        except Exception as e:
-            print(f"[WARN] Skip {f}: {e}")
-            continue
+    # 边解析边写出，避免在内存里拼接整份 HTML
+    try:
+        with open(tmp_out, "w", encoding="utf-8") as fh:
+            fh.write(HTML_TEMPLATE)
+            # 解析是 CPU 密集型，交给进程池；map 保证结果顺序与 logs 一致
+            with ProcessPoolExecutor(max_workers=min(len(logs), os.cpu_count() or 1)) as ex:
+                for i, (f, (result, err)) in enumerate(zip(logs, ex.map(_load_structure, logs))):
+                    if err is not None:
+                        print(f"[WARN] Skip {f}: {err}")
+                        continue
 
-        xyz = atoms_to_xyz(atoms, comment=os.path.basename(f))
-        jsmol_script = xyz_to_jsmol_data_script(xyz)
-        formula = atoms.get_chemical_formula()
-        card = make_card(i, f, len(atoms), formula, jsmol_script)
-        cards_html.append(card)
-        n_ok += 1
+                    xyz, natoms, formula = result
+                    jsmol_script = xyz_to_jsmol_data_script(xyz)
+                    fh.write(make_card(i, f, natoms, formula, jsmol_script))
+                    fh.write("\n")
+                    n_ok += 1
 
-    if not cards_html:
-        raise SystemExit("Parsed 0 final structures from .log files.")
+            # 直接闭合HTML文档，不需要额外的tail
+            fh.write("</div>\n</body>\n</html>")
 
-    # 直接闭合HTML文档，不需要额外的tail
-    html_doc = HTML_TEMPLATE + "\n".join(cards_html) + "\n</div>\n</body>\n</html>"
-    out = "gallery_jsmol.html"
-    with open(out, "w", encoding="utf-8") as fh:
-        fh.write(html_doc)
+        if not n_ok:
+            raise SystemExit("Parsed 0 final structures from .log files.")
+        os.replace(tmp_out, out)
+    except BaseException:
+        # 写出或重命名失败时清理残留的 .part 文件
+        if os.path.exists(tmp_out):
+            os.remove(tmp_out)
+        raise
     print(
         f"Done. Wrote interactive gallery to: {os.path.abspath(out)}  (parsed {n_ok} structures)")
 
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 import os
-import glob
 import io
 import html
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from string import Template
 import numpy as np
+from ase import Atoms
 from ase.io import read
 import cclib
 
@@ -33,20 +36,124 @@ HTML_TEMPLATE = r"""<!DOCTYPE html>
   .warning{color:#ffc107;font-weight:600}
 </style>
 <script src="https://chemapps.stolaf.edu/jmol/jsmol/JSmol.min.js"></script>
+<script>
+  // 所有卡片共用的 JSmol 参数，卡片里只覆盖 script
+  var JMOL_BASE = {
+    width: "100%",
+    height: 400,
+    debug: false,
+    color: "0xFFFFFF",
+    use: "HTML5",
+    j2sPath: "https://chemapps.stolaf.edu/jmol/jsmol/j2s",
+    disableJ2SLoadMonitor: true,
+    disableInitialConsole: true,
+    allowJavaScript: true,
+    serverURL: "https://chemapps.stolaf.edu/jmol/jsmol/php/jsmol.php",
+    addSelectionOptions: false,
+    console: "none"
+  };
+</script>
 </head>
 <body>
 <div class="grid">
 """
 
+_NL2PIPE = str.maketrans({"\n": "|"})
+_JS_ESCAPE = str.maketrans({'"': '&quot;', "'": "\\'"})
+
+SINGLE_MODE_CONTROLS = Template(r"""
+        <div class="controls">
+          <button onclick="showStructure$idx()">Structure</button>
+          <button onclick="showVibration$idx()">Show vibration</button>
+          <span class="freq-info imaginary">$freq cm⁻¹</span>
+        </div>""")
+
+MULTI_MODE_CONTROLS = Template(r"""
+        <div class="controls">
+          <button onclick="showStructure$idx()">Structure</button>
+          <button onclick="showVibrations$idx()">Show vibrations</button>
+          <select id="freqSelect$idx" onchange="changeVibration$idx()" disabled>
+            <option value="0">Select imaginary mode...</option>
+            $options
+          </select>
+        </div>""")
+
+NO_MODE_CONTROLS = Template(r"""
+        <div class="controls">
+          <button onclick="showStructure$idx()">Structure</button>
+          <span style="color:#888;">No imaginary frequencies</span>
+        </div>""")
+
+# 整张卡片一次 substitute 生成，大段振动脚本只拷贝一次；
+# applet 只生成一次：getAppletHtml("id", Info) 注入
+CARD_TEMPLATE = Template(r"""
+    <div class="card">
+      <div class="meta">
+        <div class="name">$safe_title</div>
+        <div class="summary">Atoms: $natoms | Formula: $formula | Imaginary modes: $n_imaginary</div>
+        $warning_text
+      </div>
+      $vibration_controls
+      <div id="app$idx" class="viewer"></div>
+      <script>
+        (function(){
+          if(!window.Applets) window.Applets = {};
+          var baseScript = "$esc_base";
+          var vibrScript = "$esc_vibr";
+          // 默认振动幅度更明显一些
+          var vibScale = 0.8;
+
+          var Info = Object.assign({}, JMOL_BASE, { script: baseScript });
+          var html = Jmol.getAppletHtml("app$idx", Info);
+          var host = document.getElementById("app$idx");
+          host.innerHTML = html;
+          window.Applets["app$idx"] = Jmol._applets["app$idx"];
+          // 初始样式
+          Jmol.script(window.Applets["app$idx"], "background white; set antialiasDisplay on;");
+          Jmol.script(window.Applets["app$idx"], "select *; spacefill 23%; wireframe 0.15;");
+          Jmol.script(window.Applets["app$idx"], "zoom 100; center all;");
+
+          // 切换函数
+          window.showStructure$idx = function() {
+            Jmol.script(window.Applets["app$idx"], baseScript);
+            Jmol.script(window.Applets["app$idx"], "vibration off; select *; spacefill 23%; wireframe 0.15;");
+            var s = document.getElementById("freqSelect$idx");
+            if (s) s.disabled = true;
+          };
+          window.showVibration$idx = function() {
+            if (!vibrScript) return;
+            Jmol.script(window.Applets["app$idx"], vibrScript);
+            Jmol.script(window.Applets["app$idx"], "vibration on; vibration scale " + vibScale + "; model 1;");
+          };
+          window.showVibrations$idx = function() {
+            if (!vibrScript) return;
+            Jmol.script(window.Applets["app$idx"], vibrScript);
+            Jmol.script(window.Applets["app$idx"], "vibration on; vibration scale " + vibScale + "; model 1;");
+            var s = document.getElementById("freqSelect$idx");
+            if (s) s.disabled = false;
+          };
+          window.changeVibration$idx = function() {
+            var s = document.getElementById("freqSelect$idx");
+            var m = s ? s.value : 0;
+            if (m > 0) {
+              Jmol.script(window.Applets["app$idx"], "model " + m + "; vibration on; vibration scale " + vibScale + ";");
+            }
+          };
+        })();
+      </script>
+    </div>
+    """)
+
 def atoms_to_xyz(atoms, comment=""):
     """Convert ASE atoms to XYZ format string."""
-    lines = []
-    lines.append(str(len(atoms)))
-    lines.append(comment)
-    for atom in atoms:
-        symbol = atom.symbol
-        x, y, z = atom.position
-        lines.append(f"{symbol} {x:.6f} {y:.6f} {z:.6f}")
+    natoms = len(atoms)
+    lines = [str(natoms), comment]
+    if natoms:
+        # (N, 4) object 表：符号 + xyz，整个正文由一次 % 格式化生成
+        table = np.empty((natoms, 4), dtype=object)
+        table[:, 0] = atoms.get_chemical_symbols()
+        table[:, 1:] = atoms.get_positions()
+        lines.append("\n".join(["%s %.6f %.6f %.6f"] * natoms) % tuple(table.ravel()))
     return "\n".join(lines)
 
 def create_jsmol_vibration_script(atoms, frequencies, normal_modes):
@@ -55,86 +162,92 @@ def create_jsmol_vibration_script(atoms, frequencies, normal_modes):
     """
     if not frequencies or not normal_modes:
         return None
-    coords = []
-    for atom in atoms:
-        symbol = atom.symbol
-        x, y, z = atom.position
-        coords.append(f"{symbol} {x:.6f} {y:.6f} {z:.6f}")
+    symbols = atoms.get_chemical_symbols()
+    positions = atoms.get_positions().tolist()
+    coords = [f"{s} {p[0]:.6f} {p[1]:.6f} {p[2]:.6f}" for s, p in zip(symbols, positions)]
     natoms = len(atoms)
     script_lines = ["load data 'model VIBRATIONS'"]
-    for i, (freq, mode) in enumerate(zip(frequencies, normal_modes)):
+    for freq, mode in zip(frequencies, normal_modes):
         script_lines.append(f"{natoms}")
         script_lines.append(f"freq = {freq:.2f} cm-1")
-        for j, coord_line in enumerate(coords):
-            dx, dy, dz = mode[j]
-            script_lines.append(f"{coord_line} 0 {dx:.6f} {dy:.6f} {dz:.6f}")
+        disp = np.asarray(mode).tolist()
+        script_lines.extend(
+            f"{coord_line} 0 {d[0]:.6f} {d[1]:.6f} {d[2]:.6f}" for coord_line, d in zip(coords, disp)
+        )
     script_lines.append("end 'model VIBRATIONS'")
-    return "\n".join(script_lines).replace("\n", "|")
+    return "|".join(script_lines)
 
 def xyz_to_jsmol_data_script(xyz_text):
     """Convert multi-line XYZ to JSmol inline 'load data' script."""
-    xyz_oneline = xyz_text.replace("\n", "|")
+    xyz_oneline = xyz_text.translate(_NL2PIPE)
     # 不使用 'show data;'，避免生成额外信息区/空框
     return "data 'model X'|" + xyz_oneline + "|end 'model X';"
 
+def _ase_final_atoms(log_file):
+    """ASE 兜底：读取日志最后一帧，返回 (atoms, error)。"""
+    try:
+        return read(log_file, format="gaussian-out", index=-1), None
+    except Exception as e:
+        return None, str(e)
+
 def parse_gaussian_output(log_file):
-    """Parse Gaussian16 log file to get final structure and imaginary freqs."""
+    """
+    Parse Gaussian16 log file to get final structure and imaginary freqs.
+    Returns (atoms, frequencies, modes, error); error is the parser failure
+    message (or None) so callers decide where to report it.
+    """
     try:
+        # cclib 只解析一次；拿不到坐标属正常情况，直接交给 ASE，不算解析错误
         parser = cclib.io.ccopen(log_file)
         data = parser.parse()
-        if hasattr(data, 'atomcoords') and len(data.atomcoords) > 0:
-            final_coords = data.atomcoords[-1]
-            atomic_numbers = data.atomnos
-            from ase import Atoms
-            atoms = Atoms(numbers=atomic_numbers, positions=final_coords)
-        else:
-            atoms = read(log_file, format="gaussian-out", index=-1)
-            data = None
+        if not hasattr(data, 'atomcoords') or len(data.atomcoords) == 0:
+            atoms, error = _ase_final_atoms(log_file)
+            return atoms, [], [], error
+        atoms = Atoms(numbers=data.atomnos, positions=data.atomcoords[-1])
         imaginary_frequencies, imaginary_modes = [], []
-        if data and hasattr(data, 'vibfreqs') and hasattr(data, 'vibdisps'):
+        if hasattr(data, 'vibfreqs') and hasattr(data, 'vibdisps'):
             for i, freq in enumerate(data.vibfreqs):
                 if freq < 0:
                     imaginary_frequencies.append(freq)
                     if i < len(data.vibdisps):
                         imaginary_modes.append(data.vibdisps[i])
-        return atoms, imaginary_frequencies, imaginary_modes
+        return atoms, imaginary_frequencies, imaginary_modes, None
     except Exception as e:
-        print(f"Error parsing {log_file}: {e}")
-        try:
-            atoms = read(log_file, format="gaussian-out", index=-1)
-            return atoms, [], []
-        except:
-            return None, [], []
-
-def _tail_contains(path, needle, n_lines=400):
-    """Read last n_lines of a text file and test whether 'needle' appears."""
+        atoms, _ = _ase_final_atoms(log_file)
+        return atoms, [], [], str(e)
+
+def _read_tail(path, n_lines=400):
+    """Return the raw bytes of roughly the last n_lines of a file (b"" if unreadable)."""
     try:
         with open(path, 'rb') as f:
             f.seek(0, os.SEEK_END)
             size = f.tell()
             # 估算读取字节数（每行~120字节为粗略估计）
-            approx = min(size, n_lines * 200)
-            f.seek(max(0, size - approx), os.SEEK_SET)
-            tail = f.read().decode(errors='ignore')
-        return needle in tail
+            f.seek(max(0, size - n_lines * 200), os.SEEK_SET)
+            return f.read()
     except Exception:
-        return False
+        return b""
+
+def _termination_flags(path):
+    """Return (has_normal, has_error) from the log tail, compared as bytes."""
+    tail = _read_tail(path, n_lines=600)
+    return b"Normal termination of Gaussian" in tail, b"Error termination" in tail
 
-def gaussian_normally_terminated(path):
+def _prefetch_termination_flags(paths):
     """
-    判定 Gaussian 日志是否“正常结束”：
-    - 包含 'Normal termination of Gaussian'
-    - 且不包含 'Error termination'
+    Read all log tails on a thread pool so per-file disk/NFS latency overlaps
+    instead of queueing. Returns {path: (has_normal, has_error)}.
     """
-    has_normal = _tail_contains(path, "Normal termination of Gaussian", n_lines=600)
-    has_error  = _tail_contains(path, "Error termination", n_lines=600)
-    return has_normal and not has_error
+    with ThreadPoolExecutor(max_workers=min(32, len(paths))) as ex:
+        return dict(zip(paths, ex.map(_termination_flags, paths)))
 
-def make_vibration_card(idx, title, atoms, frequencies, normal_modes):
-    """Create HTML card with vibrational visualization for imaginary modes."""
+def make_vibration_card(idx, title, atoms, xyz, formula, frequencies, normal_modes):
+    """
+    Create HTML card with vibrational visualization for imaginary modes.
+    'xyz' and 'formula' are precomputed by the parse worker (see _process_log).
+    """
     safe_title = html.escape(title)
     natoms = len(atoms)
-    formula = atoms.get_chemical_formula()
     n_imaginary = len(frequencies)
     warning_text = ""
     if n_imaginary == 0:
@@ -143,7 +256,6 @@ def make_vibration_card(idx, title, atoms, frequencies, normal_modes):
         warning_text = f'<div class="warning">⚠ {n_imaginary} imaginary frequencies (higher-order saddle point)</div>'
 
     # Base structure
-    xyz = atoms_to_xyz(atoms, comment=os.path.basename(title))
     base_script = xyz_to_jsmol_data_script(xyz)
 
     # Vibrations (if any)
@@ -152,163 +264,127 @@ def make_vibration_card(idx, title, atoms, frequencies, normal_modes):
         vibr_script = create_jsmol_vibration_script(atoms, frequencies, normal_modes) or ""
 
     # Escape for JS
-    esc_base = base_script.replace('"', '&quot;').replace("'", "\\'")
-    esc_vibr = vibr_script.replace('"', '&quot;').replace("'", "\\'") if vibr_script else ""
+    esc_base = base_script.translate(_JS_ESCAPE)
+    esc_vibr = vibr_script.translate(_JS_ESCAPE)
 
     # Controls
     if n_imaginary == 1:
         freq = frequencies[0]
-        vibration_controls = f"""
-        <div class="controls">
-          <button onclick="showStructure{idx}()">Structure</button>
-          <button onclick="showVibration{idx}()">Show vibration</button>
-          <span class="freq-info imaginary">{freq:.1f} cm⁻¹</span>
-        </div>"""
+        vibration_controls = SINGLE_MODE_CONTROLS.substitute(idx=idx, freq=f"{freq:.1f}")
     elif n_imaginary > 1:
         options = "\n".join(
             f'<option value="{i+1}">{f:.1f} cm⁻¹</option>' for i, f in enumerate(frequencies)
         )
-        vibration_controls = f"""
-        <div class="controls">
-          <button onclick="showStructure{idx}()">Structure</button>
-          <button onclick="showVibrations{idx}()">Show vibrations</button>
-          <select id="freqSelect{idx}" onchange="changeVibration{idx}()" disabled>
-            <option value="0">Select imaginary mode...</option>
-            {options}
-          </select>
-        </div>"""
+        vibration_controls = MULTI_MODE_CONTROLS.substitute(idx=idx, options=options)
     else:
-        vibration_controls = f"""
-        <div class="controls">
-          <button onclick="showStructure{idx}()">Structure</button>
-          <span style="color:#888;">No imaginary frequencies</span>
-        </div>"""
+        vibration_controls = NO_MODE_CONTROLS.substitute(idx=idx)
 
-    # 只生成一次 applet：getAppletHtml("id", Info) 注入
-    javascript_code = f"""
-      <script>
-        (function(){{
-          if(!window.Applets) window.Applets = {{}};
-          var baseScript = "{esc_base}";
-          var vibrScript = "{esc_vibr}";
-          // 默认振动幅度更明显一些
-          var vibScale = 0.8;
+    return CARD_TEMPLATE.substitute(
+        idx=idx, safe_title=safe_title, natoms=natoms, formula=formula,
+        n_imaginary=n_imaginary, warning_text=warning_text,
+        vibration_controls=vibration_controls, esc_base=esc_base, esc_vibr=esc_vibr)
 
-          var Info = {{
-            width: "100%",
-            height: 400,
-            debug: false,
-            color: "0xFFFFFF",
-            use: "HTML5",
-            j2sPath: "https://chemapps.stolaf.edu/jmol/jsmol/j2s",
-            script: baseScript,
-            disableJ2SLoadMonitor: true,
-            disableInitialConsole: true,
-            allowJavaScript: true,
-            serverURL: "https://chemapps.stolaf.edu/jmol/jsmol/php/jsmol.php",
-            addSelectionOptions: false,
-            console: "none"
-          }};
-          var html = Jmol.getAppletHtml("app{idx}", Info);
-          var host = document.getElementById("app{idx}");
-          host.innerHTML = html;
-          window.Applets["app{idx}"] = Jmol._applets["app{idx}"];
-          // 初始样式
-          Jmol.script(window.Applets["app{idx}"], "background white; set antialiasDisplay on;");
-          Jmol.script(window.Applets["app{idx}"], "select *; spacefill 23%; wireframe 0.15;");
-          Jmol.script(window.Applets["app{idx}"], "zoom 100; center all;");
+def _process_log(log_file):
+    """
+    Worker run in a child process: parse one log and derive the XYZ text and
+    formula there, so the main process only assembles the card.
+    Returns (result, error); result is None when parsing failed. Errors are
+    printed by main so console output stays in log order.
+    """
+    atoms, frequencies, normal_modes, error = parse_gaussian_output(log_file)
+    if atoms is None:
+        return None, error
+    xyz = atoms_to_xyz(atoms, comment=os.path.basename(log_file))
+    return (atoms, xyz, atoms.get_chemical_formula(), frequencies, normal_modes), error
 
-          // 切换函数
-          window.showStructure{idx} = function() {{
-            Jmol.script(window.Applets["app{idx}"], baseScript);
-            Jmol.script(window.Applets["app{idx}"], "vibration off; select *; spacefill 23%; wireframe 0.15;");
-            var s = document.getElementById("freqSelect{idx}");
-            if (s) s.disabled = true;
-          }};
-          window.showVibration{idx} = function() {{
-            if (!vibrScript) return;
-            Jmol.script(window.Applets["app{idx}"], vibrScript);
-            Jmol.script(window.Applets["app{idx}"], "vibration on; vibration scale " + vibScale + "; model 1;");
-          }};
-          window.showVibrations{idx} = function() {{
-            if (!vibrScript) return;
-            Jmol.script(window.Applets["app{idx}"], vibrScript);
-            Jmol.script(window.Applets["app{idx}"], "vibration on; vibration scale " + vibScale + "; model 1;");
-            var s = document.getElementById("freqSelect{idx}");
-            if (s) s.disabled = false;
-          }};
-          window.changeVibration{idx} = function() {{
-            var s = document.getElementById("freqSelect{idx}");
-            var m = s ? s.value : 0;
-            if (m > 0) {{
-              Jmol.script(window.Applets["app{idx}"], "model " + m + "; vibration on; vibration scale " + vibScale + ";");
-            }}
-          }};
-        }})();
-      </script>"""
-
-    return f"""
-    <div class="card">
-      <div class="meta">
-        <div class="name">{safe_title}</div>
-        <div class="summary">Atoms: {natoms} | Formula: {formula} | Imaginary modes: {n_imaginary}</div>
-        {warning_text}
-      </div>
-      {vibration_controls}
-      <div id="app{idx}" class="viewer"></div>
-      {javascript_code}
-    </div>
+_NAT_RE = re.compile(r"(\d+)")
+
+def _natural_key(path):
+    """自然排序键：file2.log 排在 file10.log 之前。"""
+    return [int(c) if c.isdigit() else c.lower() for c in _NAT_RE.split(os.path.basename(path))]
+
+def _find_logs(directory="."):
     """
+    列出目录下的 *.log 并自然排序。
+    用 os.scandir 只做后缀判断，省去 glob 的模式匹配；与 glob 一样跳过隐藏文件，
+    normcase 保证 Windows 下 .LOG 也能匹配。
+    """
+    with os.scandir(directory) as it:
+        logs = [e.name for e in it
+                if not e.name.startswith(".") and os.path.normcase(e.name).endswith(".log") and e.is_file()]
+    logs.sort(key=_natural_key)
+    return logs
 
 def main():
-    logs = sorted(glob.glob("*.log"))
+    logs = _find_logs()
     if not logs:
         raise SystemExit("No .log files found in current folder.")
     print("=" * 60)
 
-    cards_html = []
-    n_valid_ts = n_minimum = n_higher_order = n_errors = n_skipped = 0
-
-    for i, log_file in enumerate(logs):
-        print(f"Processing {log_file}...")
-
-        # 新增：未正常结束的日志直接跳过并打印
-        if not gaussian_normally_terminated(log_file):
-            if _tail_contains(log_file, "Error termination", n_lines=600):
-                print(f"[SKIP] {log_file}: error-terminated (Gaussian reported an error).")
-            else:
-                print(f"[SKIP] {log_file}: not normally terminated (no 'Normal termination of Gaussian').")
-            n_skipped += 1
-            continue
-
-        atoms, frequencies, normal_modes = parse_gaussian_output(log_file)
-        if atoms is None:
-            print(f"[ERROR] Failed to parse {log_file}")
-            n_errors += 1
-            continue
-
-        n_imaginary = len(frequencies)
-        if n_imaginary == 1:
-            n_valid_ts += 1
-            print(f"  -> Valid transition state: {frequencies[0]:.2f} cm⁻¹")
-        elif n_imaginary == 0:
-            n_minimum += 1
-            print(f"  -> WARNING: No imaginary frequencies found (appears to be minimum)")
-        else:
-            n_higher_order += 1
-            print(f"  -> WARNING: {n_imaginary} imaginary frequencies: {[f'{f:.2f}' for f in frequencies]} cm⁻¹")
-
-        card = make_vibration_card(i - n_skipped, log_file, atoms, frequencies, normal_modes)
-        cards_html.append(card)
-
-    if not cards_html:
-        raise SystemExit("No valid structures found in log files.")
-
-    html_doc = HTML_TEMPLATE + "\n".join(cards_html) + "\n</div>\n</body>\n</html>"
+    # 先并发读取所有日志尾部，判定是否正常结束
+    terminations = _prefetch_termination_flags(logs)
 
     output_file = "gaussian_ts_analysis.html"
-    with open(output_file, "w", encoding="utf-8") as fh:
-        fh.write(html_doc)
+    tmp_file = output_file + ".part"
+    n_cards = n_valid_ts = n_minimum = n_higher_order = n_errors = n_skipped = 0
+
+    # 每张卡片生成后立即写出，不在内存中保留整份 HTML
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as fh:
+            fh.write(HTML_TEMPLATE)
+            # 解析是 CPU 密集型，交给进程池；未正常结束的日志不送去解析
+            to_parse = [f for f, (has_normal, has_error) in terminations.items() if has_normal and not has_error]
+            with ProcessPoolExecutor(max_workers=max(1, min(len(to_parse), os.cpu_count() or 1))) as ex:
+                parsed = ex.map(_process_log, to_parse)  # 结果顺序与 to_parse 一致
+                for i, log_file in enumerate(logs):
+                    print(f"Processing {log_file}...")
+
+                    # 新增：未正常结束的日志直接跳过并打印
+                    has_normal, has_error = terminations[log_file]
+                    if has_error:
+                        print(f"[SKIP] {log_file}: error-terminated (Gaussian reported an error).")
+                        n_skipped += 1
+                        continue
+                    if not has_normal:
+                        print(f"[SKIP] {log_file}: not normally terminated (no 'Normal termination of Gaussian').")
+                        n_skipped += 1
+                        continue
+
+                    result, error = next(parsed)
+                    if error is not None:
+                        print(f"Error parsing {log_file}: {error}")
+                    if result is None:
+                        print(f"[ERROR] Failed to parse {log_file}")
+                        n_errors += 1
+                        continue
+                    atoms, xyz, formula, frequencies, normal_modes = result
+
+                    n_imaginary = len(frequencies)
+                    if n_imaginary == 1:
+                        n_valid_ts += 1
+                        print(f"  -> Valid transition state: {frequencies[0]:.2f} cm⁻¹")
+                    elif n_imaginary == 0:
+                        n_minimum += 1
+                        print(f"  -> WARNING: No imaginary frequencies found (appears to be minimum)")
+                    else:
+                        n_higher_order += 1
+                        print(f"  -> WARNING: {n_imaginary} imaginary frequencies: {[f'{f:.2f}' for f in frequencies]} cm⁻¹")
+
+                    fh.write(make_vibration_card(i - n_skipped, log_file, atoms, xyz, formula,
+                                                 frequencies, normal_modes))
+                    fh.write("\n")
+                    n_cards += 1
+
+            fh.write("</div>\n</body>\n</html>")
+
+        if not n_cards:
+            raise SystemExit("No valid structures found in log files.")
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        # 写出或重命名失败时清理残留的 .part 文件
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
 
     print("\n" + "=" * 60)
     print("TRANSITION STATE ANALYSIS SUMMARY")
@@ -318,7 +394,7 @@ def main():
     print(f"Higher-order saddle points:  {n_higher_order}")
     print(f"Parse errors:                {n_errors}")
     print(f"Skipped (not finished):      {n_skipped}")
-    print(f"Total processed:             {len(cards_html)}")
+    print(f"Total processed:             {n_cards}")
     print(f"\nOutput: {os.path.abspath(output_file)}")
 
 if __name__ == "__main__":
@@ -3,13 +3,15 @@
 Generate a local HTML viewer that follows the AMK visualization style for
 all XYZ structures contained in ./min_xyz/*.xyz.
 """
-import glob
+import hashlib
 import html
-import json
 import os
 import re
+from collections import Counter
 from pathlib import Path
+from string import Template
 
+import numpy as np
 from ase.io import read
 
 try:
@@ -25,15 +27,23 @@ except Exception:  # pragma: no cover - fallback when optional module is absent
 
 
 def _fallback_atoms_to_xyz(atoms, comment=""):
-    lines = [str(len(atoms)), comment]
-    for atom in atoms:
-        x, y, z = atom.position
-        lines.append(f"{atom.symbol} {x:.6f} {y:.6f} {z:.6f}")
+    natoms = len(atoms)
+    lines = [str(natoms), comment]
+    if natoms:
+        # Interleave symbols and coordinates into one (N, 4) table so the whole
+        # body is produced by a single %-format call instead of one per atom.
+        table = np.empty((natoms, 4), dtype=object)
+        table[:, 0] = atoms.get_chemical_symbols()
+        table[:, 1:] = atoms.get_positions()
+        lines.append("\n".join(["%s %.6f %.6f %.6f"] * natoms) % tuple(table.ravel()))
     return "\n".join(lines)
 
 
+_NL2PIPE = str.maketrans({"\n": "|"})
+
+
 def _fallback_xyz_to_jsmol_data_script(xyz_text):
-    xyz_oneline = xyz_text.replace("\n", "|")
+    xyz_oneline = xyz_text.translate(_NL2PIPE)
     return "data 'model X'|" + xyz_oneline + "|end 'model X';"
 
 
@@ -72,8 +82,83 @@ DEFAULT_HTML_TEMPLATE = r"""<!DOCTYPE html>
 """
 
 
+CARD_TEMPLATE = Template(r"""
+    <div class="card">
+      <div class="meta">
+        <div class="name">$safe_title</div>
+        <div class="summary">Atoms: $natoms | Formula: $formula</div>
+        <div class="freq-info">Path: $rel_path</div>
+      </div>
+      <div class="controls">
+        <button onclick="showBallStick$idx()">Ball &amp; Stick</button>
+        <button onclick="showStick$idx()">Stick</button>
+        <button onclick="showSpacefill$idx()">Spacefill</button>
+        <button onclick="resetView$idx()">Reset view</button>
+      </div>
+      <div id="app$idx" class="viewer"></div>
+      <script>
+        (function(){
+          if(!window.Applets) window.Applets = {};
+          var Info = Object.assign({}, JMOL_BASE, { script: $script });
+          var host = document.getElementById("app$idx");
+          host.innerHTML = Jmol.getAppletHtml("app$idx", Info);
+          var applet = window.Applets["app$idx"] = Jmol._applets["app$idx"];
+          Jmol.script(applet, "background white; set antialiasDisplay on; center all; zoom 100;");
+
+          var currentStyle = "ballstick";
+          var representationCommands = {
+            ballstick: "select *; spacefill 23%; wireframe 0.15;",
+            stick: "select *; spacefill 0; wireframe 0.2;",
+            spacefill: "select *; spacefill 100%; wireframe 0;"
+          };
+
+          function applyStyle(style) {
+            var cmd = representationCommands[style] || representationCommands.ballstick;
+            currentStyle = style in representationCommands ? style : "ballstick";
+            Jmol.script(applet, cmd);
+          }
+
+          applyStyle(currentStyle);
+
+          window.showBallStick$idx = function() { applyStyle("ballstick"); };
+          window.showStick$idx = function() { applyStyle("stick"); };
+          window.showSpacefill$idx = function() { applyStyle("spacefill"); };
+          window.resetView$idx = function() {
+            Jmol.script(applet, "reset; center all; zoom 100; spin off;");
+            applyStyle(currentStyle);
+          };
+        })();
+      </script>
+    </div>
+    """)
+
+
+JMOL_BASE_SCRIPT = r"""<script>
+  var JMOL_BASE = {
+    width: "100%",
+    height: 420,
+    debug: false,
+    color: "0xFFFFFF",
+    use: "HTML5",
+    j2sPath: "https://chemapps.stolaf.edu/jmol/jsmol/j2s",
+    disableJ2SLoadMonitor: true,
+    disableInitialConsole: true,
+    allowJavaScript: true,
+    serverURL: "https://chemapps.stolaf.edu/jmol/jsmol/php/jsmol.php",
+    addSelectionOptions: false,
+    console: "none"
+  };
+</script>
+"""
+
+
 def _derive_html_template():
     base = AMK_HTML_TEMPLATE or DEFAULT_HTML_TEMPLATE
+    # Cards only pass their script; everything else comes from JMOL_BASE.
+    if "</head>" in base:
+        base = base.replace("</head>", JMOL_BASE_SCRIPT + "</head>", 1)
+    else:
+        base += JMOL_BASE_SCRIPT
     if "Gaussian16 Transition State Visualization" in base:
         base = base.replace(
             "Gaussian16 Transition State Visualization",
@@ -94,85 +179,59 @@ def parse_xyz_file(path):
         return None
 
 
-def make_structure_card(idx, file_path, atoms):
-    safe_title = html.escape(os.path.basename(file_path))
-    rel_path = html.escape(os.path.relpath(file_path))
-    natoms = len(atoms)
-    formula = atoms.get_chemical_formula()
-    xyz_text = atoms_to_xyz(atoms, comment=rel_path)
-    base_script = xyz_to_jsmol_data_script(xyz_text)
+_JS_STR = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
 
-    javascript_code = f"""
-      <script>
-        (function(){{
-          if(!window.Applets) window.Applets = {{}};
-          var Info = {{
-            width: "100%",
-            height: 420,
-            debug: false,
-            color: "0xFFFFFF",
-            use: "HTML5",
-            j2sPath: "https://chemapps.stolaf.edu/jmol/jsmol/j2s",
-            script: {json.dumps(base_script)},
-            disableJ2SLoadMonitor: true,
-            disableInitialConsole: true,
-            allowJavaScript: true,
-            serverURL: "https://chemapps.stolaf.edu/jmol/jsmol/php/jsmol.php",
-            addSelectionOptions: false,
-            console: "none"
-          }};
-          var host = document.getElementById("app{idx}");
-          host.innerHTML = Jmol.getAppletHtml("app{idx}", Info);
-          var applet = window.Applets["app{idx}"] = Jmol._applets["app{idx}"];
-          Jmol.script(applet, "background white; set antialiasDisplay on; center all; zoom 100;");
 
-          var currentStyle = "ballstick";
-          var representationCommands = {{
-            ballstick: "select *; spacefill 23%; wireframe 0.15;",
-            stick: "select *; spacefill 0; wireframe 0.2;",
-            spacefill: "select *; spacefill 100%; wireframe 0;"
-          }};
+def _js_string(text):
+    """Quote text as a double-quoted JS string literal."""
+    return '"' + text.translate(_JS_STR) + '"'
 
-          function applyStyle(style) {{
-            var cmd = representationCommands[style] || representationCommands.ballstick;
-            currentStyle = style in representationCommands ? style : "ballstick";
-            Jmol.script(applet, cmd);
-          }}
 
-          applyStyle(currentStyle);
+def _xyz_body(atoms):
+    """Format the XYZ atom lines once; the header is added per card."""
+    return atoms_to_xyz(atoms).split("\n", 2)[2] if len(atoms) else ""
 
-          window.showBallStick{idx} = function() {{ applyStyle("ballstick"); }};
-          window.showStick{idx} = function() {{ applyStyle("stick"); }};
-          window.showSpacefill{idx} = function() {{ applyStyle("spacefill"); }};
-          window.resetView{idx} = function() {{
-            Jmol.script(applet, "reset; center all; zoom 100; spin off;");
-            applyStyle(currentStyle);
-          }};
-        }})();
-      </script>
+
+def _xyz_text(natoms, comment, body):
+    """Prepend the XYZ count and comment lines to a formatted body."""
+    return f"{natoms}\n{comment}\n{body}" if natoms else f"{natoms}\n{comment}"
+
+
+def _geometry_key(body):
+    """Hash the XYZ atom lines only; the comment line differs per file."""
+    return hashlib.blake2b(body.encode("utf-8"), digest_size=8).digest()
+
+
+def make_structure_card(idx, file_path, natoms, formula, body, key=None, shared_scripts=None):
     """
+    Render one structure card from a pre-formatted XYZ ``body``.
 
-    return f"""
-    <div class="card">
-      <div class="meta">
-        <div class="name">{safe_title}</div>
-        <div class="summary">Atoms: {natoms} | Formula: {formula}</div>
-        <div class="freq-info">Path: {rel_path}</div>
-      </div>
-      <div class="controls">
-        <button onclick="showBallStick{idx}()">Ball &amp; Stick</button>
-        <button onclick="showStick{idx}()">Stick</button>
-        <button onclick="showSpacefill{idx}()">Spacefill</button>
-        <button onclick="resetView{idx}()">Reset view</button>
-      </div>
-      <div id="app{idx}" class="viewer"></div>
-      {javascript_code}
-    </div>
+    ``shared_scripts`` maps the geometry keys that occur more than once to
+    their JS variable name (None until first emitted). The first card with
+    such a geometry emits a ``SHARED_<key>`` variable holding a payload with
+    a neutral comment line; every card with that key then references it.
+    Geometries that occur once are inlined as before.
     """
+    safe_title = html.escape(os.path.basename(file_path))
+    rel_path = html.escape(os.path.relpath(file_path))
+
+    preamble = ""
+    if shared_scripts is not None and key in shared_scripts:
+        script = shared_scripts[key]
+        if script is None:
+            script = shared_scripts[key] = f"SHARED_{key.hex()}"
+            payload = _js_string(xyz_to_jsmol_data_script(_xyz_text(natoms, "", body)))
+            preamble = f"\n    <script>var {script} = {payload};</script>"
+    else:
+        xyz_text = _xyz_text(natoms, rel_path, body)
+        script = _js_string(xyz_to_jsmol_data_script(xyz_text))
 
+    return preamble + CARD_TEMPLATE.substitute(
+        idx=idx, safe_title=safe_title, rel_path=rel_path, natoms=natoms,
+        formula=formula, script=script)
 
-def build_page(cards):
-    return HTML_TEMPLATE + "\n".join(cards) + "\n</div>\n</body>\n</html>"
+
+_NAT_RE = re.compile(r"(\d+)")
 
 
 def _natural_key(path):
@@ -180,13 +239,34 @@ def _natural_key(path):
     basename = os.path.basename(path)
     return [
         int(chunk) if chunk.isdigit() else chunk.lower()
-        for chunk in re.split(r"(\d+)", basename)
+        for chunk in _NAT_RE.split(basename)
     ]
 
 
+def _find_xyz_files(directory):
+    """
+    Return naturally sorted ``directory/*.xyz`` paths.
+
+    Uses a single os.scandir pass with a suffix test rather than glob's
+    pattern matching; hidden files are skipped as glob does.
+    """
+    try:
+        with os.scandir(directory) as it:
+            paths = [
+                os.path.join(directory, entry.name)
+                for entry in it
+                if not entry.name.startswith(".")
+                and os.path.normcase(entry.name).endswith(".xyz")
+                and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return []
+    paths.sort(key=_natural_key)
+    return paths
+
+
 def main():
-    pattern = os.path.join("min_xyz", "*.xyz")
-    xyz_files = sorted(glob.glob(pattern), key=_natural_key)
+    xyz_files = _find_xyz_files("min_xyz")
     if not xyz_files:
         raise SystemExit("No XYZ files found under ./min_xyz/")
 
@@ -194,10 +274,8 @@ def main():
     print(f"Discovered {len(xyz_files)} XYZ files in ./min_xyz/")
     print("=" * 60)
 
-    cards = []
-    total_atoms = 0
+    parsed = []
     skipped = 0
-
     for idx, file_path in enumerate(xyz_files):
         rel = os.path.relpath(file_path)
         print(f"[{idx+1:03d}/{len(xyz_files):03d}] {rel}")
@@ -205,22 +283,45 @@ def main():
         if atoms is None:
             skipped += 1
             continue
-        total_atoms += len(atoms)
-        cards.append(make_structure_card(len(cards), file_path, atoms))
+        # Keep the formatted body rather than the Atoms object; the cards need
+        # nothing else, and the body is formatted exactly once.
+        body = _xyz_body(atoms)
+        parsed.append((file_path, len(atoms), atoms.get_chemical_formula(), body, _geometry_key(body)))
 
-    if not cards:
-        raise SystemExit("Unable to parse any XYZ files.")
+    # Only geometries that repeat are hoisted into a shared JS variable.
+    key_counts = Counter(key for *_, key in parsed)
+    shared_scripts = {key: None for key, count in key_counts.items() if count > 1}
 
-    html_doc = build_page(cards)
     output_file = Path("xyz_visualization.html")
-    output_file.write_text(html_doc, encoding="utf-8")
+    tmp_file = output_file.with_name(output_file.name + ".part")
+    n_cards = 0
+    total_atoms = 0
+
+    try:
+        with tmp_file.open("w", encoding="utf-8") as fh:
+            fh.write(HTML_TEMPLATE)
+            for file_path, natoms, formula, body, key in parsed:
+                total_atoms += natoms
+                fh.write(make_structure_card(n_cards, file_path, natoms, formula, body, key, shared_scripts))
+                fh.write("\n")
+                n_cards += 1
+            fh.write("</div>\n</body>\n</html>")
+
+        if not n_cards:
+            raise SystemExit("Unable to parse any XYZ files.")
+        tmp_file.replace(output_file)
+    except BaseException:
+        # Never leave a stale .part file behind, whatever went wrong.
+        tmp_file.unlink(missing_ok=True)
+        raise
 
     print("\n" + "=" * 60)
     print("XYZ VISUALIZATION SUMMARY")
     print("=" * 60)
     print(f"Total files discovered : {len(xyz_files)}")
-    print(f"Successfully rendered  : {len(cards)}")
+    print(f"Successfully rendered  : {n_cards}")
     print(f"Skipped (parse errors) : {skipped}")
+    print(f"Unique geometries      : {len(key_counts)}")
     print(f"Total atoms displayed  : {total_atoms}")
     print(f"Output file            : {output_file.resolve()}")
     print("Open the HTML file in your browser to view all structures.")